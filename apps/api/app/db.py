@@ -1,31 +1,63 @@
 ﻿from __future__ import annotations
 
-from typing import AsyncGenerator
+import os
+from typing import Annotated, AsyncGenerator
 
+import orjson
+from fastapi import Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE_SECONDS, DB_POOL_SIZE
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(DATABASE_URL, pool_pre_ping=True)
+def _json_serializer(value: object) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+if hasattr(os, "register_at_fork"):
+    # rq forks a work horse per job; the child starts a fresh pool instead of sharing the parent's sockets.
+    os.register_at_fork(after_in_child=lambda: engine.sync_engine.dispose(close=False))
 AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return AsyncSessionLocal
+
+
+async def get_async_session(
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_async_sessionmaker)],
+) -> AsyncGenerator[AsyncSession, None]:
+    # Built from the sessionmaker dependency, so overriding it redirects the request session and
+    # any extra sessions an endpoint opens alongside it.
+    async with session_factory() as session:
         yield session
 
 
 async def check_db_connection() -> bool:
     try:
         async with engine.connect() as connection:
-            await connection.execute(text("SELECT 1"))
+            if engine.dialect.driver == "asyncpg":
+                # Straight to the driver: checkout has already pinged it (pool_pre_ping), and the probe
+                # skips the BEGIN/ROLLBACK SQLAlchemy would wrap around a SELECT.
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.fetchval("SELECT 1")
+            else:
+                await connection.execute(text("SELECT 1"))
         return True
     except Exception:
         return False
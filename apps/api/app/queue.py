@@ -8,6 +8,12 @@ from app.config import REDIS_URL
 
 redis_conn = Redis.from_url(REDIS_URL)
 grading_queue = Queue("grading", connection=redis_conn)
+# INCR and the first-hit EXPIRE run server-side as one script (EVALSHA after the first call).
+_RATE_LIMIT_INCR_SCRIPT = redis_conn.register_script(
+    "local current = redis.call('INCR', KEYS[1]) "
+    "if current == 1 then redis.call('EXPIRE', KEYS[1], ARGV[1]) end "
+    "return current"
+)
 
 
 def check_redis_connection() -> bool:
@@ -18,11 +24,8 @@ def check_redis_connection() -> bool:
 
 
 def increment_rate_limit(key: str, window_seconds: int) -> int:
-    pipe = redis_conn.pipeline(transaction=True)
     try:
-        pipe.incr(key)
-        pipe.expire(key, window_seconds, nx=True)
-        current, _ = pipe.execute()
+        current = _RATE_LIMIT_INCR_SCRIPT(keys=[key], args=[window_seconds])
     except RedisError:
         return -1
     return int(current)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import secrets
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import bcrypt
 from jose import JWTError, jwt
@@ -8,7 +10,11 @@ from jose import JWTError, jwt
 from app.config import ACCESS_TOKEN_EXPIRE_GRACE_MINUTES, JWT_ALGORITHM, JWT_SECRET_KEY
 
 
-def verify_password(plain_password: str, password_hash: str) -> bool:
+def verify_password(plain_password: str, password_hash: str | None) -> bool:
+    if password_hash is None:
+        # Unknown user: still pay for one check, so response time does not reveal which usernames exist.
+        bcrypt.checkpw(plain_password.encode("utf-8"), _dummy_password_hash().encode("utf-8"))
+        return False
     return bcrypt.checkpw(plain_password.encode("utf-8"), password_hash.encode("utf-8"))
 
 
@@ -16,6 +22,11 @@ def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    return hash_password(secrets.token_urlsafe(32))
+
+
 def create_access_token(subject: str, role: str, expires_delta: timedelta) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -1,7 +1,7 @@
 ﻿from __future__ import annotations
 
 from pathlib import Path
-from typing import Protocol
+from typing import BinaryIO, Protocol
 
 
 class BundleStorage(Protocol):
@@ -10,3 +10,6 @@ class BundleStorage(Protocol):
 
     def read_bundle(self, key: str) -> bytes:
         ...
+
+    def read_bundle_into(self, key: str, fp: BinaryIO) -> str:
+        ...
@@ -1,11 +1,15 @@
 ﻿from __future__ import annotations
 
+import hashlib
 import shutil
 from os.path import commonpath
 from pathlib import Path
+from typing import BinaryIO
 
 from app.storage.base import BundleStorage
 
+READ_CHUNK_BYTES = 1024 * 1024
+
 
 class LocalBundleStorage(BundleStorage):
     def __init__(self, root_dir: str) -> None:
@@ -28,3 +32,13 @@ class LocalBundleStorage(BundleStorage):
     def read_bundle(self, key: str) -> bytes:
         target = self._resolve_key(key)
         return target.read_bytes()
+
+    def read_bundle_into(self, key: str, fp: BinaryIO) -> str:
+        # Copies the bundle in chunks and returns its sha256, so callers never hold the whole archive.
+        target = self._resolve_key(key)
+        digest = hashlib.sha256()
+        with target.open("rb") as src:
+            while chunk := src.read(READ_CHUNK_BYTES):
+                digest.update(chunk)
+                fp.write(chunk)
+        return digest.hexdigest()
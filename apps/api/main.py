@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import hashlib
 import io
+import os
+import random
 import re
 import shutil
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from threading import Lock
@@ -16,9 +19,9 @@ from uuid import uuid4
 from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse, Response
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, insert, select, true
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import (
     APP_ENV,
@@ -34,7 +37,7 @@ from app.config import (
     password_reset_token_ttl,
     refresh_token_ttl,
 )
-from app.db import check_db_connection, get_async_session
+from app.db import check_db_connection, get_async_session, get_async_sessionmaker
 from app.deps import get_current_user, require_admin
 from app.models import (
     AdminAuditLog,
@@ -135,8 +138,13 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 logger = get_logger()
+# Request IDs only need to be unique per deployment, not unguessable; reseeded after fork.
+_REQUEST_ID_RANDOM = random.Random()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_REQUEST_ID_RANDOM.seed)
 
-_login_attempts: defaultdict[str, deque[float]] = defaultdict(deque)
+_LOGIN_ATTEMPTS_MAX_KEYS = 10_000
+_login_attempts: OrderedDict[str, tuple[float, int]] = OrderedDict()
 _login_rate_lock = Lock()
 _EXAM_QUESTION_TYPE_ALIASES = {
     "multiple_choice": "multiple_choice",
@@ -155,7 +163,10 @@ _EXAM_KIND_ALIASES = {
     "성취도 평가": "assessment",
 }
 _TRACK_HEX_ESCAPE_RE = re.compile(r"\\(?:u)?([0-9A-Fa-f]{4})")
-_EXAM_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".svg"}
+_SLUG_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+_EXPORT_FILENAME_UNSAFE_RE = re.compile(r"[^0-9A-Za-z_-]+")
+_EXAM_IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".svg"})
 _APPEAL_REGRADING_MODEL = "gpt-5-mini"
 _EXAM_SKILL_KEYWORD_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
     (
@@ -236,38 +247,54 @@ _EXAM_SKILL_KEYWORD_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
 )
 
 
-def _is_login_rate_limited(client_key: str) -> bool:
+def _is_login_rate_limited(client_key: str, request: Request) -> bool:
     redis_key = f"auth:login-attempts:{client_key}"
     redis_count = increment_rate_limit(redis_key, LOGIN_RATE_LIMIT_WINDOW_SECONDS)
     if redis_count >= 0:
         return redis_count > LOGIN_RATE_LIMIT_ATTEMPTS
 
-    now = time.time()
+    # Redis is unreachable: count in this process only, and say so on the response.
+    request.state.rate_limit_mode = "degraded-local"
+    # Fixed window per key, like the Redis counter; the least recently active keys are dropped
+    # once the store is full, so a flood of distinct keys cannot grow it without bound.
+    now = time.monotonic()
     with _login_rate_lock:
-        attempts = _login_attempts[client_key]
-        while attempts and now - attempts[0] > LOGIN_RATE_LIMIT_WINDOW_SECONDS:
-            attempts.popleft()
-        if len(attempts) >= LOGIN_RATE_LIMIT_ATTEMPTS:
+        window_started_at, count = _login_attempts.get(client_key, (now, 0))
+        if now - window_started_at > LOGIN_RATE_LIMIT_WINDOW_SECONDS:
+            window_started_at, count = now, 0
+        if count >= LOGIN_RATE_LIMIT_ATTEMPTS:
             return True
-        attempts.append(now)
+        _login_attempts[client_key] = (window_started_at, count + 1)
+        _login_attempts.move_to_end(client_key)
+        if len(_login_attempts) > _LOGIN_ATTEMPTS_MAX_KEYS:
+            _login_attempts.popitem(last=False)
         return False
 
 
 def _reset_login_attempts(client_key: str) -> None:
     clear_rate_limit(f"auth:login-attempts:{client_key}")
+    if client_key not in _login_attempts:
+        return
     with _login_rate_lock:
         _login_attempts.pop(client_key, None)
 
 def _hash_reset_token(token: str) -> str:
+    # Only an index key for a random token, so BLAKE2b (same 64-hex width as the column) is enough.
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def _legacy_hash_reset_token(token: str) -> str:
+    # Tokens issued before the switch to BLAKE2b; they expire within PASSWORD_RESET_TOKEN_EXPIRE_MINUTES.
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
 def _slugify(value: str) -> str:
-    slug = re.sub(r"[^a-z0-9]+", "-", value.strip().lower()).strip("-")
+    slug = _SLUG_SEPARATOR_RE.sub("-", value.strip().lower()).strip("-")
     return slug or f"folder-{uuid4().hex[:8]}"
 
 def _normalize_exam_question_type(raw_type: str) -> str:
-    normalized = _EXAM_QUESTION_TYPE_ALIASES.get(raw_type.strip().lower())
+    # Clients almost always send an exact key, so that lookup comes before strip/lower.
+    normalized = _EXAM_QUESTION_TYPE_ALIASES.get(raw_type) or _EXAM_QUESTION_TYPE_ALIASES.get(raw_type.strip().lower())
     if normalized is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -277,12 +304,9 @@ def _normalize_exam_question_type(raw_type: str) -> str:
 
 
 def _normalize_exam_kind(raw_kind: str) -> str:
-    normalized = _EXAM_KIND_ALIASES.get(raw_kind.strip().lower())
+    normalized = _EXAM_KIND_ALIASES.get(raw_kind) or _EXAM_KIND_ALIASES.get(raw_kind.strip().lower())
     if normalized is not None:
         return normalized
-    cleaned = raw_kind.strip().lower()
-    if cleaned in {"quiz", "assessment"}:
-        return cleaned
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="시험 유형은 퀴즈 또는 성취도 평가만 가능합니다.",
@@ -360,9 +384,9 @@ async def _resolve_track_name(
     label: str,
     not_found_detail: str,
 ) -> str:
-    normalized_track_name = _sanitize_track_name(raw_track_name, label=label)
+    track_key = _sanitize_track_name(raw_track_name, label=label).casefold()
     for track_name in await _load_track_names(session):
-        if track_name.casefold() == normalized_track_name.casefold():
+        if track_name.casefold() == track_key:
             return track_name
 
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=not_found_detail)
@@ -543,27 +567,24 @@ def _sanitize_exam_answer_key_text(question_type: str, answer_key_text: str | No
 
 
 async def _load_folder_path_map(session: AsyncSession) -> dict[int, str]:
-    rows = (await session.execute(select(ProblemFolder).order_by(ProblemFolder.sort_order.asc(), ProblemFolder.id.asc()))).scalars().all()
-    by_id = {folder.id: folder for folder in rows}
-    cache: dict[int, str] = {}
-
-    def build(folder_id: int) -> str:
-        cached = cache.get(folder_id)
-        if cached is not None:
-            return cached
-        folder = by_id.get(folder_id)
-        if folder is None:
-            return ""
-        if folder.parent_id is None:
-            path = folder.name
+    rows = (await session.execute(select(ProblemFolder.id, ProblemFolder.parent_id, ProblemFolder.name))).all()
+    known_ids = {folder_id for folder_id, _, _ in rows}
+    children: defaultdict[int, list[tuple[int, str]]] = defaultdict(list)
+    # A folder whose parent row is gone is treated as a root, as before.
+    pending: deque[tuple[int, str]] = deque()
+    for folder_id, parent_id, name in rows:
+        if parent_id is None or parent_id not in known_ids:
+            pending.append((folder_id, name))
         else:
-            parent_path = build(folder.parent_id)
-            path = f"{parent_path} > {folder.name}" if parent_path else folder.name
-        cache[folder_id] = path
-        return path
+            children[parent_id].append((folder_id, name))
 
-    for folder_id in by_id:
-        build(folder_id)
+    # Breadth-first from the roots: each path is its parent's path plus one name.
+    cache: dict[int, str] = {}
+    while pending:
+        folder_id, path = pending.popleft()
+        cache[folder_id] = path
+        for child_id, child_name in children.pop(folder_id, ()):
+            pending.append((child_id, f"{path} > {child_name}" if path else child_name))
     return cache
 
 
@@ -759,7 +780,7 @@ def _is_exam_resource_image(resource: ExamResource) -> bool:
     content_type = (resource.content_type or "").strip().lower()
     if content_type.startswith("image/"):
         return True
-    return Path(resource.file_name or "").suffix.lower() in _EXAM_IMAGE_EXTENSIONS
+    return os.path.splitext(resource.file_name or "")[1].lower() in _EXAM_IMAGE_EXTENSIONS
 
 
 async def _resolve_exam_question_image_resource_id(
@@ -1030,7 +1051,7 @@ def _resolve_exam_performance_band_label(exam: Exam, correct_count: int) -> str:
 
 
 def _build_prompt_preview(prompt_md: str, max_chars: int = 96) -> str:
-    compact = re.sub(r"\s+", " ", (prompt_md or "").strip())
+    compact = _WHITESPACE_RUN_RE.sub(" ", (prompt_md or "").strip())
     if len(compact) <= max_chars:
         return compact
     return f"{compact[:max_chars].rstrip()}..."
@@ -1209,7 +1230,7 @@ async def _write_admin_audit_log(
 
 @app.middleware("http")
 async def add_request_id_and_logging(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID") or uuid4().hex
+    request_id = request.headers.get("X-Request-ID") or f"{_REQUEST_ID_RANDOM.getrandbits(128):032x}"
     request.state.request_id = request_id
     started_at = time.monotonic()
     response = None
@@ -1221,6 +1242,9 @@ async def add_request_id_and_logging(request: Request, call_next):
         duration_ms = int((time.monotonic() - started_at) * 1000)
         if response is not None:
             response.headers["X-Request-ID"] = request_id
+            rate_limit_mode = getattr(request.state, "rate_limit_mode", None)
+            if rate_limit_mode:
+                response.headers["X-Rate-Limit-Mode"] = rate_limit_mode
             status_code = response.status_code
         else:
             status_code = 500
@@ -1269,7 +1293,7 @@ async def login(
     normalized_username = username.lower()
     client_host = request.client.host if request.client else "unknown"
     client_key = f"{client_host}:{normalized_username}"
-    if _is_login_rate_limited(client_key):
+    if _is_login_rate_limited(client_key, request):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해 주세요.",
@@ -1277,7 +1301,13 @@ async def login(
 
     result = await session.execute(select(User).where(func.lower(User.username) == normalized_username))
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(payload.password, user.password_hash):
+    # bcrypt runs off the event loop (it releases the GIL), so slow checks do not stall other requests.
+    password_ok = await asyncio.to_thread(
+        verify_password,
+        payload.password,
+        user.password_hash if user is not None else None,
+    )
+    if user is None or not password_ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
 
     _reset_login_attempts(client_key)
@@ -1355,9 +1385,6 @@ async def register(
     if len(username) > 50:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="아이디는 50자 이하여야 합니다.")
 
-    existing = await session.scalar(select(User).where(func.lower(User.username) == normalized_username))
-    if existing is not None:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 사용 중인 아이디입니다.")
     display_name = payload.name.strip()
     if len(display_name) < 2:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="이름은 2자 이상이어야 합니다.")
@@ -1376,6 +1403,7 @@ async def register(
     )
     session.add(user)
     try:
+        # No preflight SELECT: the unique index on lower(username) rejects a taken username here.
         await session.commit()
     except IntegrityError as exc:
         await session.rollback()
@@ -1426,8 +1454,8 @@ async def reset_password(
     if len(payload.new_password) < 8:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="비밀번호는 8자 이상이어야 합니다.")
 
-    hashed = _hash_reset_token(payload.token)
-    reset_token = await session.scalar(select(PasswordResetToken).where(PasswordResetToken.token_hash == hashed))
+    token_hashes = (_hash_reset_token(payload.token), _legacy_hash_reset_token(payload.token))
+    reset_token = await session.scalar(select(PasswordResetToken).where(PasswordResetToken.token_hash.in_(token_hashes)))
     now = datetime.now(timezone.utc)
     if reset_token is None or reset_token.used_at is not None or reset_token.expires_at < now:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="유효하지 않거나 만료된 재설정 토큰입니다.")
@@ -1454,80 +1482,110 @@ async def me(user: Annotated[User, Depends(get_current_user)]) -> MeResponse:
     )
 
 
-async def _compute_skill_progress(
-    session: AsyncSession, user_id: int
-) -> tuple[list[ProgressSkillItem], list[ProgressRecentSubmission]]:
-    all_skills_rows = await session.execute(select(Skill.id, Skill.name).order_by(Skill.id.asc()))
-    accum: dict[int, dict[str, float | int | str]] = {
-        skill_id: {"skill_name": skill_name, "earned_points": 0.0, "possible_points": 0.0}
-        for skill_id, skill_name in all_skills_rows.all()
-    }
-
-    skill_rows = await session.execute(
-        select(Skill.id, Skill.name, Grade.score, Grade.max_score, ProblemVersionSkill.weight)
-        .join(ProblemVersionSkill, ProblemVersionSkill.skill_id == Skill.id)
-        .join(ProblemVersion, ProblemVersion.id == ProblemVersionSkill.problem_version_id)
-        .join(Submission, Submission.problem_version_id == ProblemVersion.id)
+def _skill_points_query():
+    return (
+        select(
+            Submission.user_id,
+            ProblemVersionSkill.skill_id,
+            func.sum(Grade.score * ProblemVersionSkill.weight).label("earned_points"),
+            func.sum(Grade.max_score * ProblemVersionSkill.weight).label("possible_points"),
+        )
+        .join(Submission, Submission.problem_version_id == ProblemVersionSkill.problem_version_id)
         .join(Grade, Grade.submission_id == Submission.id)
-        .where(Submission.user_id == user_id)
+        .group_by(Submission.user_id, ProblemVersionSkill.skill_id)
     )
 
-    for skill_id, skill_name, score, max_score, weight in skill_rows.all():
-        record = accum.setdefault(
-            skill_id,
-            {"skill_name": skill_name, "earned_points": 0.0, "possible_points": 0.0},
-        )
-        record["earned_points"] += float(score * weight)
-        record["possible_points"] += float(max_score * weight)
+
+def _mastery_percent(earned: float, possible: float) -> float:
+    return 0.0 if possible <= 0 else round((earned / possible) * 100, 2)
+
+
+async def _compute_skill_progress(
+    session: AsyncSession, session_factory: async_sessionmaker[AsyncSession], user_id: int
+) -> tuple[list[ProgressSkillItem], list[ProgressRecentSubmission]]:
+    # Points are summed per skill in SQL; the outer join keeps skills the user has no grades for.
+    points_by_skill = _skill_points_query().where(Submission.user_id == user_id).subquery()
+    # The recent-submission list runs on a second session from the same factory, so both queries
+    # are in flight at once. The extra pool connection is held for one short query; the
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW budget (15 per API process by default) covers it, and past
+    # that a checkout waits for a free connection rather than failing.
+    skill_rows, recent_submissions = await asyncio.gather(
+        session.execute(
+            select(
+                Skill.id,
+                Skill.name,
+                func.coalesce(points_by_skill.c.earned_points, 0),
+                func.coalesce(points_by_skill.c.possible_points, 0),
+            )
+            .outerjoin(points_by_skill, points_by_skill.c.skill_id == Skill.id)
+            .order_by(Skill.id.asc())
+        ),
+        _load_recent_progress_submissions(session_factory, user_id),
+    )
 
     skills = []
-    for skill_id, record in accum.items():
-        earned = float(record["earned_points"])
-        possible = float(record["possible_points"])
-        mastery = 0.0 if possible <= 0 else round((earned / possible) * 100, 2)
+    for skill_id, skill_name, earned_points, possible_points in skill_rows.all():
+        earned = float(earned_points)
+        possible = float(possible_points)
         skills.append(
             ProgressSkillItem(
                 skill_id=skill_id,
-                skill_name=str(record["skill_name"]),
+                skill_name=skill_name,
                 earned_points=earned,
                 possible_points=possible,
-                mastery=mastery,
+                mastery=_mastery_percent(earned, possible),
             )
         )
     skills.sort(key=lambda item: item.mastery, reverse=True)
+    return skills, recent_submissions
 
-    recent_rows = await session.execute(
-        select(Submission, Grade, ProblemVersion, Problem)
-        .join(ProblemVersion, ProblemVersion.id == Submission.problem_version_id)
-        .join(Problem, Problem.id == ProblemVersion.problem_id)
-        .outerjoin(Grade, Grade.submission_id == Submission.id)
-        .where(Submission.user_id == user_id)
-        .order_by(Submission.id.desc())
-        .limit(10)
-    )
-    recent_submissions = [
+
+async def _load_recent_progress_submissions(
+    session_factory: async_sessionmaker[AsyncSession], user_id: int
+) -> list[ProgressRecentSubmission]:
+    async with session_factory() as session:
+        recent_rows = await session.execute(
+            select(
+                Submission.id,
+                Problem.id,
+                Problem.title,
+                ProblemVersion.version,
+                Submission.status,
+                Submission.created_at,
+                Grade.score,
+                Grade.max_score,
+            )
+            .join(ProblemVersion, ProblemVersion.id == Submission.problem_version_id)
+            .join(Problem, Problem.id == ProblemVersion.problem_id)
+            .outerjoin(Grade, Grade.submission_id == Submission.id)
+            .where(Submission.user_id == user_id)
+            .order_by(Submission.id.desc())
+            .limit(10)
+        )
+    return [
         ProgressRecentSubmission(
-            submission_id=submission.id,
-            problem_id=problem.id,
-            problem_title=problem.title,
-            problem_version=problem_version.version,
-            status=submission.status,
-            created_at=submission.created_at,
-            score=grade.score if grade else None,
-            max_score=grade.max_score if grade else None,
+            submission_id=submission_id,
+            problem_id=problem_id,
+            problem_title=problem_title,
+            problem_version=problem_version,
+            status=submission_status,
+            created_at=created_at,
+            score=score,
+            max_score=max_score,
+        )
+        for submission_id, problem_id, problem_title, problem_version, submission_status, created_at, score, max_score in (
+            recent_rows.all()
         )
-        for submission, grade, problem_version, problem in recent_rows.all()
     ]
 
-    return skills, recent_submissions
-
 
 @app.get("/me/progress", response_model=MeProgressResponse)
 async def me_progress(
     user: Annotated[User, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_async_sessionmaker)],
 ) -> MeProgressResponse:
-    skills, recent_submissions = await _compute_skill_progress(session, user.id)
+    skills, recent_submissions = await _compute_skill_progress(session, session_factory, user.id)
     return MeProgressResponse(skills=skills, recent_submissions=recent_submissions)
 
 
@@ -1537,23 +1595,35 @@ async def admin_capture_mastery_snapshots(
     admin_user: Annotated[User, Depends(require_admin)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
 ) -> dict[str, int]:
-    user_ids = [user_id for user_id in (await session.execute(select(User.id))).scalars().all()]
-    captured = 0
+    # One snapshot per user x skill, zeros included, from a single aggregate query and one bulk insert.
+    points = _skill_points_query().subquery()
+    rows = await session.execute(
+        select(
+            User.id,
+            Skill.id,
+            func.coalesce(points.c.earned_points, 0),
+            func.coalesce(points.c.possible_points, 0),
+        )
+        .select_from(User)
+        .join(Skill, true())
+        .outerjoin(points, and_(points.c.user_id == User.id, points.c.skill_id == Skill.id))
+        .order_by(User.id.asc(), Skill.id.asc())
+    )
     now = datetime.now(timezone.utc)
-    for user_id in user_ids:
-        skills, _ = await _compute_skill_progress(session, user_id)
-        for skill in skills:
-            session.add(
-                MasterySnapshot(
-                    user_id=user_id,
-                    skill_id=skill.skill_id,
-                    mastery=skill.mastery,
-                    earned_points=skill.earned_points,
-                    possible_points=skill.possible_points,
-                    captured_at=now,
-                )
-            )
-            captured += 1
+    snapshot_rows = [
+        {
+            "user_id": user_id,
+            "skill_id": skill_id,
+            "mastery": _mastery_percent(float(earned), float(possible)),
+            "earned_points": float(earned),
+            "possible_points": float(possible),
+            "captured_at": now,
+        }
+        for user_id, skill_id, earned, possible in rows.all()
+    ]
+    if snapshot_rows:
+        await session.execute(insert(MasterySnapshot), snapshot_rows)
+    captured = len(snapshot_rows)
 
     await _write_admin_audit_log(
         session=session,
@@ -1625,7 +1695,8 @@ async def create_admin_track(
 ) -> TrackResponse:
     track_name = _sanitize_track_name(payload.name, label="트랙")
     existing_track_names = await _load_track_names(session)
-    if any(existing_name.casefold() == track_name.casefold() for existing_name in existing_track_names):
+    track_key = track_name.casefold()
+    if any(existing_name.casefold() == track_key for existing_name in existing_track_names):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 존재하는 트랙입니다.")
 
     track = Track(name=track_name)
@@ -1652,14 +1723,10 @@ async def delete_admin_track(
     admin_user: Annotated[User, Depends(require_admin)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
 ) -> None:
-    resolved_track_name = _sanitize_track_name(track_name, label="트랙")
+    track_key = _sanitize_track_name(track_name, label="트랙").casefold()
     tracks = (await session.execute(select(Track).order_by(Track.id.asc()))).scalars().all()
     target = next(
-        (
-            track
-            for track in tracks
-            if _canonicalize_track_name(str(track.name)).casefold() == resolved_track_name.casefold()
-        ),
+        (track for track in tracks if _canonicalize_track_name(str(track.name)).casefold() == track_key),
         None,
     )
     if target is None:
@@ -2000,7 +2067,7 @@ async def list_problem_folders(session: Annotated[AsyncSession, Depends(get_asyn
 
 
 def _normalize_exam_title(raw_title: str | None) -> str:
-    return re.sub(r"\s+", " ", (raw_title or "")).strip()
+    return _WHITESPACE_RUN_RE.sub(" ", (raw_title or "")).strip()
 
 
 async def _ensure_exam_title_unique(
@@ -2701,17 +2768,22 @@ async def list_admin_exam_submissions(
         ).scalars().all()
     }
 
+    submission_ids = [int(submission.id) for submission, _ in submissions]
+    answers_by_submission: defaultdict[int, list[ExamAnswer]] = defaultdict(list)
+    answer_rows = (
+        await session.execute(
+            select(ExamAnswer)
+            .where(ExamAnswer.exam_submission_id.in_(submission_ids))
+            .order_by(ExamAnswer.exam_submission_id.asc(), ExamAnswer.id.asc())
+        )
+    ).scalars().all()
+    for answer in answer_rows:
+        answers_by_submission[int(answer.exam_submission_id)].append(answer)
+
     payload: list[AdminExamSubmissionDetail] = []
     for submission, user in submissions:
-        answer_rows = (
-            await session.execute(
-                select(ExamAnswer)
-                .where(ExamAnswer.exam_submission_id == submission.id)
-                .order_by(ExamAnswer.id.asc())
-            )
-        ).scalars().all()
         answers: list[AdminExamSubmissionAnswer] = []
-        for answer in answer_rows:
+        for answer in answers_by_submission.get(int(submission.id), []):
             question = question_map.get(answer.exam_question_id)
             if question is None:
                 continue
@@ -2842,7 +2914,7 @@ async def download_admin_exam_results_csv(
             ]
         )
 
-    file_title = re.sub(r"[^0-9A-Za-z_-]+", "_", exam.title).strip("_")[:40] or f"exam_{exam.id}"
+    file_title = _EXPORT_FILENAME_UNSAFE_RE.sub("_", exam.title).strip("_")[:40] or f"exam_{exam.id}"
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     filename = f"{file_title}_results_{timestamp}.csv"
     csv_body = f"\ufeff{buffer.getvalue()}"
@@ -2902,6 +2974,17 @@ async def prune_admin_exam_resources(
     )
 
 
+def _exam_resource_too_large_error() -> HTTPException:
+    max_mb = EXAM_RESOURCE_MAX_SIZE_BYTES // (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=(
+            f"파일 크기는 최대 {EXAM_RESOURCE_MAX_SIZE_BYTES} bytes(약 {max_mb}MB)까지 허용됩니다. "
+            "더 큰 자료는 Google Drive 링크를 시험 설명/문항에 첨부해 주세요."
+        ),
+    )
+
+
 @app.post("/admin/exams/{exam_id}/resources", response_model=ExamResourceSummary, status_code=status.HTTP_201_CREATED)
 async def upload_admin_exam_resource(
     exam_id: int,
@@ -2918,20 +3001,17 @@ async def upload_admin_exam_resource(
     if not original_name:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="업로드 파일명이 비어 있습니다.")
 
+    # The spooled upload's size is known before it is read, so oversized files never reach memory.
+    if file.size is not None and file.size > EXAM_RESOURCE_MAX_SIZE_BYTES:
+        await file.close()
+        raise _exam_resource_too_large_error()
     payload = await file.read()
     await file.close()
     size_bytes = len(payload)
     if size_bytes == 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="빈 파일은 업로드할 수 없습니다.")
     if size_bytes > EXAM_RESOURCE_MAX_SIZE_BYTES:
-        max_mb = EXAM_RESOURCE_MAX_SIZE_BYTES // (1024 * 1024)
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=(
-                f"파일 크기는 최대 {EXAM_RESOURCE_MAX_SIZE_BYTES} bytes(약 {max_mb}MB)까지 허용됩니다. "
-                "더 큰 자료는 Google Drive 링크를 시험 설명/문항에 첨부해 주세요."
-            ),
-        )
+        raise _exam_resource_too_large_error()
 
     suffix = Path(original_name).suffix[:20]
     stored_name = f"{uuid4().hex}{suffix}"
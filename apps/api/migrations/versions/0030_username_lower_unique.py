@@ -0,0 +1,44 @@
+"""enforce case-insensitive username uniqueness in the database
+
+Revision ID: 0030_username_lower_unique
+Revises: 0029_exam_coding_score
+Create Date: 2026-10-15 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0030_username_lower_unique"
+down_revision: Union[str, Sequence[str], None] = "0029_exam_coding_score"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "users" not in set(inspector.get_table_names()):
+        return
+
+    duplicates = bind.execute(
+        sa.text("SELECT lower(username) FROM users GROUP BY lower(username) HAVING count(*) > 1 LIMIT 5")
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"usernames differing only by case must be merged first: {', '.join(duplicates)}")
+
+    # Registration relies on this index (not a preflight SELECT) to reject taken usernames, and login's
+    # lower(username) lookup can use it. IF NOT EXISTS because expression indexes do not reflect everywhere.
+    op.create_index("ix_users_username_lower", "users", [sa.text("lower(username)")], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "users" not in set(inspector.get_table_names()):
+        return
+
+    op.drop_index("ix_users_username_lower", table_name="users", if_exists=True)
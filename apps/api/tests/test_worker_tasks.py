@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import worker_tasks
+from app.models import ExamAnswer, ExamQuestion
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+
+def _temp_exam_answers_table() -> Table:
+    # Same column types as exam_answers but no foreign keys; a temp table shadows the real one
+    # on this connection, so the update statement runs unchanged without parent rows.
+    columns = (*worker_tasks._EXAM_ANSWER_GRADE_COLUMNS, "graded_at")
+    return Table(
+        "exam_answers",
+        MetaData(),
+        *(Column(name, ExamAnswer.__table__.c[name].type, primary_key=name == "id") for name in columns),
+        prefixes=["TEMPORARY"],
+    )
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL.startswith("postgresql"), reason="TEST_DATABASE_URL is not a Postgres URL")
+def test_bulk_update_exam_answer_grades_all_failed_postgres() -> None:
+    async def run() -> list[tuple]:
+        engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            async with engine.connect() as conn:
+                table = _temp_exam_answers_table()
+                await conn.run_sync(table.create)
+                await conn.execute(table.insert(), [{"id": 1, "grading_status": "RUNNING"}, {"id": 2, "grading_status": "RUNNING"}])
+                rows = [
+                    {
+                        "id": answer_id,
+                        "grading_status": "FAILED",
+                        "grading_score": None,
+                        "grading_max_score": None,
+                        "grading_feedback_json": {"reason": "failed"},
+                        "grading_logs": "error",
+                    }
+                    for answer_id in (1, 2)
+                ]
+                async with AsyncSession(bind=conn) as session:
+                    await worker_tasks._bulk_update_exam_answer_grades(session, rows)
+                result = await conn.execute(
+                    select(table.c.id, table.c.grading_status, table.c.grading_score, table.c.graded_at).order_by(table.c.id)
+                )
+                return [tuple(row) for row in result]
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(run())
+    assert [(row[0], row[1], row[2]) for row in result] == [(1, "FAILED", None), (2, "FAILED", None)]
+    assert all(row[3] is not None for row in result)
+
+
+def test_read_captured_output_cuts_back_to_last_newline(tmp_path) -> None:
+    limit = worker_tasks.GRADER_OUTPUT_CAPTURE_MAX_BYTES
+    with (tmp_path / "out").open("w+b") as fp:
+        fp.write(b"first line\n" + b"x" * limit)
+        assert worker_tasks._read_captured_output(fp) == "first line"
+
+
+def test_read_captured_output_without_newline_is_truncated_not_dropped(tmp_path) -> None:
+    limit = worker_tasks.GRADER_OUTPUT_CAPTURE_MAX_BYTES
+    with (tmp_path / "out").open("w+b") as fp:
+        fp.write(b"x" * (limit + 100))
+        assert worker_tasks._read_captured_output(fp) == "x" * limit
+
+
+def test_bundle_cache_refuses_grader_mounted_volume(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(worker_tasks, "BUNDLE_ROOT", str(tmp_path))
+    monkeypatch.setattr(worker_tasks, "GRADER_BUNDLE_CACHE_DIR", str(tmp_path / ".grader-cache"))
+    monkeypatch.delenv("GRADER_WORKDIR_ROOT", raising=False)
+    monkeypatch.setenv("DOCKER_VOLUMES_FROM_SELF", "true")
+    assert worker_tasks._resolve_bundle_cache_root() is None
+
+    monkeypatch.setenv("DOCKER_VOLUMES_FROM_SELF", "false")
+    assert worker_tasks._resolve_bundle_cache_root() == (tmp_path / ".grader-cache").resolve()
+
+
+def _llm_targets(count: int) -> list[tuple[ExamAnswer, ExamQuestion, str]]:
+    return [
+        (
+            ExamAnswer(id=index, answer_text=f"answer {index}"),
+            ExamQuestion(type="subjective", order_index=index, prompt_md=f"question {index}"),
+            f"key {index}",
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def test_failed_llm_batch_is_regraded_per_answer(monkeypatch) -> None:
+    calls: list[str] = []
+
+    async def fake_request_llm_json(*, system_prompt: str, **_: Any) -> dict[str, Any]:
+        if system_prompt == worker_tasks.LLM_BATCH_SYSTEM_PROMPT:
+            calls.append("batch")
+            raise RuntimeError("llm output is not valid json object: truncated")
+        calls.append("single")
+        return {"is_correct": True, "reason": "정답입니다."}
+
+    monkeypatch.setattr(worker_tasks, "EXAM_LLM_BATCH_SIZE", 8)
+    monkeypatch.setattr(worker_tasks, "_request_llm_json", fake_request_llm_json)
+    results = asyncio.run(worker_tasks._grade_exam_answers_with_llm_concurrently(_llm_targets(3), {}))
+
+    assert calls == ["batch", "single", "single", "single"]
+    assert set(results) == {1, 2, 3}
+    assert all(not isinstance(result, BaseException) and result[0] == 100 for result in results.values())
+
+
+def test_failed_llm_batch_on_quota_skips_per_answer_requests(monkeypatch) -> None:
+    calls: list[str] = []
+
+    async def fake_request_llm_json(*, system_prompt: str, **_: Any) -> dict[str, Any]:
+        calls.append("batch" if system_prompt == worker_tasks.LLM_BATCH_SYSTEM_PROMPT else "single")
+        raise RuntimeError("llm http error status=429 body=insufficient_quota")
+
+    monkeypatch.setattr(worker_tasks, "EXAM_LLM_BATCH_SIZE", 8)
+    monkeypatch.setattr(worker_tasks, "_request_llm_json", fake_request_llm_json)
+    results = asyncio.run(worker_tasks._grade_exam_answers_with_llm_concurrently(_llm_targets(3), {}))
+
+    assert calls == ["batch"]
+    assert all(isinstance(result, RuntimeError) for result in results.values())
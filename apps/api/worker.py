@@ -4,17 +4,38 @@ import os
 
 from redis import Redis
 from rq import SimpleWorker, Worker
+from rq.worker_pool import WorkerPool
 
-from app.config import REDIS_URL
+from app.config import GRADER_CONCURRENCY, GRADER_INPROCESS_JOBS, REDIS_URL
+from app.worker_tasks import configure_bundle_compression, start_persistent_grader
 
 
 def main() -> None:
     redis_url = os.getenv("REDIS_URL", REDIS_URL)
     conn = Redis.from_url(redis_url)
-    worker_cls = SimpleWorker if os.name == "nt" else Worker
+    bundle_codec = configure_bundle_compression()
+    # Without a fork per job, the worker event loop, DB pool and LLM HTTP session stay warm
+    # across submissions; the trade-off is that a crashing job takes its worker down with it.
+    worker_cls = SimpleWorker if os.name == "nt" or GRADER_INPROCESS_JOBS else Worker
+    # Each pool member is its own worker process, so N submissions grade side by side.
+    concurrency = max(GRADER_CONCURRENCY, 1) if os.name != "nt" else 1
+    if concurrency > 1:
+        # The persistent sidecar stays off here: one member restarting it would kill another member's run.
+        print(
+            f"[worker] listening queue=grading redis={redis_url} bundle_codec={bundle_codec} "
+            f"grader_sidecar=off concurrency={concurrency} inprocess_jobs={GRADER_INPROCESS_JOBS}"
+        )
+        WorkerPool(["grading"], connection=conn, num_workers=concurrency, worker_class=worker_cls).start()
+        return
+
     worker = worker_cls(["grading"], connection=conn)
-    print(f"[worker] listening queue=grading redis={redis_url}")
-    worker.work()
+    grader_sidecar = start_persistent_grader() or "off"
+    print(
+        f"[worker] listening queue=grading redis={redis_url} bundle_codec={bundle_codec} "
+        f"grader_sidecar={grader_sidecar} inprocess_jobs={GRADER_INPROCESS_JOBS}"
+    )
+    # The scheduler releases delayed grading retries (see _schedule_grading_retry).
+    worker.work(with_scheduler=True)
 
 
 if __name__ == "__main__":